@@ -1,4 +1,4 @@
-import numpy as np
+import math
 
 class NoteManager:
     def __init__(self):
@@ -15,6 +15,10 @@ class NoteManager:
                 self.note_to_midi[note_name] = midi_number
                 self.midi_to_note[midi_number] = note_name
 
+        # MIDI number to frequency, computed once (A4 is MIDI note 69, 440 Hz)
+        self.midi_to_freq = [440.0 * (2.0 ** ((midi_number - 69) / 12.0))
+                             for midi_number in range(len(self.midi_to_note))]
+
         # Computer keyboard to note mapping (2 octaves)
         self.key_to_note = {
             # Lower octave (Z-M)
@@ -48,15 +52,13 @@ class NoteManager:
     def get_frequency(self, note_name):
         """Convert a note name (e.g., 'A4') to its frequency in Hz."""
         if note_name in self.note_to_midi:
-            midi_number = self.note_to_midi[note_name]
-            # A4 is MIDI note 69, frequency 440 Hz
-            return 440.0 * (2.0 ** ((midi_number - 69) / 12.0))
+            return self.midi_to_freq[self.note_to_midi[note_name]]
         return None
 
     def get_note_from_frequency(self, frequency):
         """Convert a frequency to the closest note name."""
         # Calculate MIDI note number from frequency
-        midi_number = int(round(12 * np.log2(frequency/440.0) + 69))
+        midi_number = int(round(12 * math.log2(frequency/440.0) + 69))
         return self.midi_to_note.get(midi_number)
 
     def get_note_from_key(self, key):
@@ -320,8 +320,8 @@ class SynthesizerApp(tk.Tk):
                         'duration': note.duration,
                         'velocity': note.velocity,
                         'waveform': note.waveform,
-                        'adsr': note.adsr,
-                        'effects': note.effects
+                        'adsr': dict(note.adsr),
+                        'effects': {k: dict(v) for k, v in note.effects.items()}
                     }
                     group_data['notes'].append(note_data)
 
@@ -0,0 +1,101 @@
+import numpy as np
+
+# Numba is optional: when it is missing the kernels fall back to the
+# equivalent NumPy expressions.
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+def _active_mask_numpy(starts, durs, t):
+    """Return a boolean mask of the notes sounding at time t."""
+    return (starts <= t) & (t < starts + durs)
+
+
+def _compute_boxes_numpy(starts, durs, midis, px_per_sec, x_offset, grid_size, x_lo, x_hi):
+    """Return the x1, y1, x2, y2 note boxes and a mask of those within [x_lo, x_hi]."""
+    x1 = (starts * px_per_sec + x_offset).astype(np.int64)
+    x2 = ((starts + durs) * px_per_sec + x_offset).astype(np.int64)
+    y1 = (88 - midis) * grid_size
+    y2 = y1 + grid_size
+    visible = (x2 >= x_lo) & (x1 <= x_hi)
+    return x1, y1, x2, y2, visible
+
+
+def _nearest_edge_numpy(starts, durs, midis, px_per_sec, grid_size, x, y, exclude):
+    """Return the distance to and x of the nearest note edge in the rows around y.
+
+    The note at index exclude is skipped. The distance is inf when no
+    note is in range.
+    """
+    rows = (88 - midis) * grid_size
+    near = np.abs(rows - y) <= grid_size
+    if 0 <= exclude < near.size:
+        near[exclude] = False
+    if not near.any():
+        return np.inf, 0
+    edges = np.concatenate((
+        (starts[near] * px_per_sec).astype(np.int64),
+        ((starts[near] + durs[near]) * px_per_sec).astype(np.int64)
+    ))
+    dists = np.abs(edges - x)
+    i = int(dists.argmin())
+    return float(dists[i]), int(edges[i])
+
+
+if njit is not None:
+    @njit(cache=True)
+    def active_mask(starts, durs, t):
+        """Return a boolean mask of the notes sounding at time t."""
+        out = np.empty(starts.size, np.bool_)
+        for i in range(starts.size):
+            out[i] = starts[i] <= t < starts[i] + durs[i]
+        return out
+
+    @njit(cache=True, parallel=True)
+    def compute_boxes(starts, durs, midis, px_per_sec, x_offset, grid_size, x_lo, x_hi):
+        """Return the x1, y1, x2, y2 note boxes and a mask of those within [x_lo, x_hi]."""
+        n = starts.size
+        x1 = np.empty(n, np.int64)
+        y1 = np.empty(n, np.int64)
+        x2 = np.empty(n, np.int64)
+        y2 = np.empty(n, np.int64)
+        visible = np.empty(n, np.bool_)
+        for i in prange(n):
+            x1[i] = np.int64(starts[i] * px_per_sec + x_offset)
+            x2[i] = np.int64((starts[i] + durs[i]) * px_per_sec + x_offset)
+            y1[i] = (88 - midis[i]) * grid_size
+            y2[i] = y1[i] + grid_size
+            visible[i] = x2[i] >= x_lo and x1[i] <= x_hi
+        return x1, y1, x2, y2, visible
+
+    # No fastmath here: it lets the compiler assume no infinities, which
+    # would break the inf sentinel returned when no note is in range
+    @njit(cache=True)
+    def nearest_edge(starts, durs, midis, px_per_sec, grid_size, x, y, exclude):
+        """Return the distance to and x of the nearest note edge in the rows around y.
+
+        The note at index exclude is skipped. The distance is inf when no
+        note is in range.
+        """
+        best = np.inf
+        best_x = 0
+        for i in range(starts.size):
+            if i == exclude or abs((88 - midis[i]) * grid_size - y) > grid_size:
+                continue
+            x1 = np.int64(starts[i] * px_per_sec)
+            x2 = np.int64((starts[i] + durs[i]) * px_per_sec)
+            d1 = abs(x1 - x)
+            if d1 < best:
+                best = d1
+                best_x = x1
+            d2 = abs(x2 - x)
+            if d2 < best:
+                best = d2
+                best_x = x2
+        return best, best_x
+else:
+    active_mask = _active_mask_numpy
+    compute_boxes = _compute_boxes_numpy
+    nearest_edge = _nearest_edge_numpy
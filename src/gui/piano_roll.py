@@ -1,9 +1,78 @@
+import bisect
+import math
+import threading
+import time
+from collections import deque
+from types import MappingProxyType
 import tkinter as tk
 from tkinter import ttk
 import numpy as np
 from src.audio_engine.note_manager import NoteManager
+from src.gui.note_roll_kernels import active_mask, compute_boxes, nearest_edge
+
+# Groups with more notes than this use the array kernel for playback scans
+ACTIVE_SCAN_THRESHOLD = 50
+
+# MIDI note number -> frequency in Hz, and the reverse for exact table pitches.
+# MIDI_FREQS holds the same table as Python floats for scalar lookups.
+MIDI_HZ = 440.0 * 2.0 ** ((np.arange(128) - 69) / 12.0)
+MIDI_FREQS = MIDI_HZ.tolist()
+HZ_MIDI = {round(freq, 4): midi for midi, freq in enumerate(MIDI_FREQS)}
+
+def freq_to_midi(frequency):
+    """Get the nearest MIDI note number for a frequency."""
+    midi = HZ_MIDI.get(round(frequency, 4))
+    if midi is None:
+        midi = round(12 * math.log2(frequency / 440) + 69)
+    return midi
+
+# Group colors, assigned by the group's position in the roll
+PALETTE = (
+    '#E74C3C', '#3498DB', '#2ECC71', '#F1C40F', '#9B59B6',
+    '#1ABC9C', '#E67E22', '#EC7063', '#5DADE2', '#A9CCE3'
+)
+
+# Settings shared by every note that doesn't override them. They are
+# read-only; the config dialog assigns fresh dicts to a note instead.
+DEFAULT_ADSR = MappingProxyType(
+    {'attack': 0.1, 'decay': 0.1, 'sustain': 0.7, 'release': 0.2})
+DEFAULT_EFFECTS = MappingProxyType({
+    'tremolo': MappingProxyType({'enabled': False, 'rate': 5, 'depth': 0.3}),
+    'delay': MappingProxyType({'enabled': False, 'time': 0.1, 'feedback': 0.3}),
+    'reverb': MappingProxyType({'enabled': False, 'size': 0.3})
+})
+
+def _row_meta(i):
+    """Get the separator color and C label, or None, of grid row i."""
+    midi_note = 88 - i
+    note_number = midi_note % 12
+    if note_number == 0:
+        return i, '#444444', f"C{(midi_note // 12) - 1}"
+    is_black = note_number in [1, 3, 6, 8, 10]
+    return i, '#222222' if is_black else '#333333', None
+
+# Row index, separator color and C label for each of the 88 grid rows
+_ROW_META = tuple(_row_meta(i) for i in range(88))
+
+# Wheel direction of the Linux scroll buttons
+_WHEEL_DIRS = {4: 1, 5: -1}
+
+def _hash_name(name):
+    """Get the 64-bit FNV-1a hash of a name, stable across runs."""
+    h = 0xcbf29ce484222325
+    for byte in name.encode('utf-8'):
+        h = ((h ^ byte) * 0x100000001b3) & 0xFFFFFFFFFFFFFFFF
+    return h
+
+def _start_time(note):
+    return note.start_time
 
 class Note:
+    __slots__ = ('_frequency', 'midi', 'start_time', 'duration', 'velocity',
+                 'waveform', 'adsr', 'effects', 'effect_cmds')
+
+    _default_effect_cmds = None
+
     def __init__(self, frequency, start_time, duration, velocity=1.0,
                  waveform='sine', adsr=None, effects=None):
         self.frequency = frequency
@@ -11,27 +80,225 @@ class Note:
         self.duration = duration
         self.velocity = velocity
         self.waveform = waveform
-        self.adsr = adsr or {'attack': 0.1, 'decay': 0.1, 'sustain': 0.7, 'release': 0.2}
-        self.effects = effects or {
-            'tremolo': {'enabled': False, 'rate': 5, 'depth': 0.3},
-            'delay': {'enabled': False, 'time': 0.1, 'feedback': 0.3},
-            'reverb': {'enabled': False, 'size': 0.3}
-        }
+        self.adsr = adsr or DEFAULT_ADSR
+        self.effects = effects or DEFAULT_EFFECTS
+        self.rebuild_effect_cmds()
+
+    @property
+    def frequency(self):
+        return self._frequency
+
+    @frequency.setter
+    def frequency(self, value):
+        # Keep the cached MIDI number in step with the frequency
+        self._frequency = value
+        self.midi = freq_to_midi(value)
+
+    def rebuild_effect_cmds(self):
+        """Precompute the synth effect calls for this note's effect settings."""
+        if self.effects is DEFAULT_EFFECTS:
+            # Notes on the default effects share one command list
+            if Note._default_effect_cmds is None:
+                Note._default_effect_cmds = self._effect_cmds_for(DEFAULT_EFFECTS)
+            self.effect_cmds = Note._default_effect_cmds
+        else:
+            self.effect_cmds = self._effect_cmds_for(self.effects)
+
+    @staticmethod
+    def _effect_cmds_for(effects):
+        return [
+            (effect, params['enabled'],
+             [(f"{effect}_{param}", value)
+              for param, value in params.items() if param != 'enabled'])
+            for effect, params in effects.items()
+        ]
+
+class NoteSnapshot:
+    """Read-only copy of a group's notes and their timings.
+
+    Snapshots never change once built, so the playback thread can read them
+    while the UI thread edits the group.
+    """
+    __slots__ = ('notes', 'starts', 'durs', 'ends', 'max_duration')
+
+    def __init__(self, notes, starts, durs, max_duration):
+        self.notes = tuple(notes)
+        self.starts = starts
+        self.durs = durs
+        self.ends = (starts + durs).tolist()
+        self.max_duration = max_duration
+
+    def notes_at(self, time_pos):
+        """Get the notes sounding at time_pos."""
+        starts = self.starts
+
+        # Only notes starting within max_duration before time_pos can overlap it
+        lo = int(np.searchsorted(starts, time_pos - self.max_duration, side='right'))
+        hi = int(np.searchsorted(starts, time_pos, side='right'))
+        notes = self.notes
+        if hi - lo > ACTIVE_SCAN_THRESHOLD:
+            mask = active_mask(starts[lo:hi], self.durs[lo:hi], time_pos)
+            return [notes[lo + i] for i in np.flatnonzero(mask)]
+        ends = self.ends
+        return [notes[i] for i in range(lo, hi) if time_pos < ends[i]]
 
 class NoteGroup:
-    def __init__(self, name, color=None):
+    def __init__(self, name, color=None, index=None):
         self.name = name
-        self.color = color if color else self._generate_color_from_name(name)
+        if color:
+            self.color = color
+        elif index is not None:
+            self.color = PALETTE[index % len(PALETTE)]
+        else:
+            self.color = self._generate_color_from_name(name)
+        self.muted_color = '#666666'
         self.notes = []
         self.visible = True
         self.muted = False
         self.solo = False
+        self.tag = f'grp_{id(self)}'  # Canvas tag shared by this group's notes
+        self.max_duration = 0.0
+        self.max_end = 0.0  # Latest note end, updated with the note arrays
+        self._arrays = None
+        self._snapshot = None
+
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, value):
+        # Precompute the RGB components and the lighter highlight color once
+        # instead of parsing the hex string on every redraw
+        self._color = value
+        self.rgb = (int(value[1:3], 16), int(value[3:5], 16), int(value[5:7], 16))
+        self.highlight_color = '#{:02x}{:02x}{:02x}'.format(
+            *(min(255, int(c * 1.2)) for c in self.rgb))
+
+    def add_note(self, note):
+        """Insert a note, keeping the notes sorted by start time."""
+        bisect.insort(self.notes, note, key=_start_time)
+        self._arrays = None
+        self._snapshot = None
+
+    def invalidate(self):
+        """Drop the cached note arrays after the notes have changed."""
+        self._arrays = None
+        self._snapshot = None
+
+    def note_arrays(self):
+        """Get the notes as parallel arrays.
+
+        Rebuilding the arrays also re-sorts the notes by start time, so
+        the notes list and the arrays always share the same order.
+
+        Returns:
+            dict: 'start', 'dur' and 'freq' float arrays and a 'midi' int
+            array, each indexed like the notes list
+        """
+        if self._arrays is None or len(self._arrays['start']) != len(self.notes):
+            notes = self.notes
+            notes.sort(key=_start_time)
+            self._arrays = {
+                'start': np.array([note.start_time for note in notes], dtype=np.float64),
+                'dur': np.array([note.duration for note in notes], dtype=np.float64),
+                'freq': np.array([note.frequency for note in notes], dtype=np.float64),
+                'midi': np.array([note.midi for note in notes], dtype=np.int64)
+            }
+            self.max_duration = float(self._arrays['dur'].max()) if notes else 0.0
+            self.max_end = (float((self._arrays['start'] + self._arrays['dur']).max())
+                            if notes else 0.0)
+            self._snapshot = None
+        return self._arrays
+
+    def note_moved(self, i):
+        """Update the arrays after the note at index i changed its timing or pitch.
+
+        The note is moved to its sorted position with a binary search and
+        a shift of the slots in between, instead of rebuilding the arrays
+        from every note. The shift works on copies, since undo and playback
+        snapshots keep the old arrays by reference.
+        """
+        arrays = self.note_arrays()
+        start, dur, freq, midi = (arrays[k].copy() for k in ('start', 'dur', 'freq', 'midi'))
+        notes = self.notes
+        note = notes[i]
+        old_dur = float(dur[i])
+        old_end = float(start[i]) + old_dur
+
+        # Index of the note's new slot once it is taken out of slot i
+        j = int(np.searchsorted(start, note.start_time, side='right'))
+        if j > i:
+            j -= 1
+            for arr in (start, dur, freq, midi):
+                arr[i:j] = arr[i + 1:j + 1]
+        elif j < i:
+            for arr in (start, dur, freq, midi):
+                arr[j + 1:i + 1] = arr[j:i]
+        if j != i:
+            notes.insert(j, notes.pop(i))
+        start[j] = note.start_time
+        dur[j] = note.duration
+        freq[j] = note.frequency
+        midi[j] = note.midi
+        self._arrays = {'start': start, 'dur': dur, 'freq': freq, 'midi': midi}
+        self._snapshot = None
+
+        # The maxima only need a full pass when the note held them and shrank
+        new_end = note.start_time + note.duration
+        if note.duration >= self.max_duration:
+            self.max_duration = note.duration
+        elif old_dur == self.max_duration:
+            self.max_duration = float(dur.max())
+        if new_end >= self.max_end:
+            self.max_end = new_end
+        elif old_end == self.max_end:
+            self.max_end = float((start + dur).max())
+
+    def window(self, t0, t1):
+        """Get the index range of the notes that may overlap the times t0 to t1.
+
+        Only notes starting within max_duration before t0 can reach it, so
+        the range is found with two binary searches over the start times.
+
+        Returns:
+            tuple: lo and hi indices into the notes list and note arrays
+        """
+        starts = self.note_arrays()['start']
+        lo = int(np.searchsorted(starts, t0 - self.max_duration, side='left'))
+        hi = int(np.searchsorted(starts, t1, side='right'))
+        return lo, hi
+
+    def index_of(self, note):
+        """Get a note's index in the notes list, or -1 if it is not there.
+
+        The note is found by a binary search over the start times, so the
+        arrays must be up to date with its start time.
+        """
+        starts = self.note_arrays()['start']
+        notes = self.notes
+        for i in range(int(np.searchsorted(starts, note.start_time, side='left')), len(notes)):
+            if notes[i] is note:
+                return i
+            if starts[i] != note.start_time:
+                break
+        return -1
+
+    def snapshot(self):
+        """Get a read-only snapshot of the notes, rebuilt after changes."""
+        arrays = self.note_arrays()
+        if self._snapshot is None:
+            self._snapshot = NoteSnapshot(self.notes, arrays['start'],
+                                          arrays['dur'], self.max_duration)
+        return self._snapshot
+
+    def notes_at(self, time_pos):
+        """Get the notes sounding at time_pos."""
+        return self.snapshot().notes_at(time_pos)
 
     def _generate_color_from_name(self, name):
         """Generate a deterministic color based on the group name."""
-        name_hash = hash(name)
-        positive_hash = abs(name_hash)
-        hex_hash = positive_hash % 0xFFFFFF
+        hex_hash = _hash_name(name) & 0xFFFFFF
 
         r = (hex_hash & 0xFF0000) >> 16
         g = (hex_hash & 0x00FF00) >> 8
@@ -46,41 +313,6 @@ class NoteGroup:
 
         return f'#{r:02x}{g:02x}{b:02x}'
 
-class PianoKey(tk.Frame):
-    """A piano key widget."""
-    def __init__(self, parent, is_black=False, width=40, height=100):
-        super().__init__(parent)
-        self.configure(
-            width=width,
-            height=height,
-            bg='black' if is_black else 'white',
-            relief='solid',
-            bd=1
-        )
-
-        # Make sure the frame doesn't resize
-        self.pack_propagate(False)
-
-        # Bind mouse events
-        self.bind('<Button-1>', self._on_press)
-        self.bind('<ButtonRelease-1>', self._on_release)
-
-        # Track pressed state
-        self.pressed = False
-        self.is_black = is_black
-
-    def _on_press(self, event):
-        """Handle key press."""
-        self.pressed = True
-        self.configure(bg='#666666' if self.is_black else '#CCCCCC')
-        self.event_generate('<<KeyPressed>>')
-
-    def _on_release(self, event):
-        """Handle key release."""
-        self.pressed = False
-        self.configure(bg='black' if self.is_black else 'white')
-        self.event_generate('<<KeyReleased>>')
-
 class PianoRoll(tk.Frame):
     def __init__(self, parent, synth):
         super().__init__(parent)
@@ -136,6 +368,17 @@ class PianoRoll(tk.Frame):
         self.left_keyboard_frame.grid(row=0, column=0, sticky='ns')
         self.left_keyboard_frame.grid_propagate(False)  # Prevent frame from shrinking
 
+        # The keys are drawn as items on one canvas, scrolled with the roll
+        self.keyboard_canvas = tk.Canvas(
+            self.left_keyboard_frame,
+            bg='#1E1E1E',
+            width=40,
+            highlightthickness=0
+        )
+        self.keyboard_canvas.pack(fill='both', expand=True)
+        self.keyboard_canvas.tag_bind('key', '<Button-1>', self._on_key_press)
+        self.keyboard_canvas.bind('<ButtonRelease-1>', self._on_key_release)
+
         # Create central piano roll frame
         self.piano_roll_frame = tk.Frame(self.layout_container, bg='#1E1E1E')
         self.piano_roll_frame.grid(row=0, column=1, sticky='nsew')
@@ -157,36 +400,117 @@ class PianoRoll(tk.Frame):
 
         # Configure scrolling
         self.canvas.configure(
-            xscrollcommand=self.h_scrollbar.set,
-            yscrollcommand=self.v_scrollbar.set
+            xscrollcommand=self._on_canvas_xscroll,
+            yscrollcommand=self._on_canvas_yscroll
         )
         self.timeline.configure(xscrollcommand=self.h_scrollbar.set)
 
         self.v_scrollbar.configure(command=self._on_vertical_scroll)
         self.h_scrollbar.configure(command=self._on_horizontal_scroll)
 
-        # Initialize piano keys dictionary
+        # Playback cursor lines, moved with coords rather than redrawn
+        self._cursor = self.canvas.create_line(
+            0, 0, 0, 1,
+            fill='#00FF00',
+            width=2,
+            dash=(4, 4),
+            state='hidden',
+            tags=('fg', 'cursor')
+        )
+        self._timeline_cursor = self.timeline.create_line(
+            0, 0, 0, 30,
+            fill='#00FF00',
+            width=2,
+            state='hidden'
+        )
+        self._cursor_shown = False
+
+        # Piano key items by MIDI note, the key item -> (MIDI note, is black)
+        # lookup used by the key bindings, and the key being held down
         self.piano_keys = {'left': {}}
+        self._key_info = {}
+        self._pressed_key = None
+        self._key_height = None
+
+        # Timeline label items, reused across redraws
+        self._tick_labels = []
+
+        # Last (width, height) applied to the scroll regions
+        self._scroll_size = None
+
+        # Grid items are kept across redraws until zoom or resize; the grid
+        # itself is one pre-rendered tile per grid size
+        self._bg_dirty = True
+        self._grid_photo = None
+        self._grid_photo_size = None
+
+        # note -> [item, box, style] for the persistent note items, and
+        # hidden items left by removed or scrolled-away notes for reuse
+        self._note_items = {}
+        self._free_note_items = []
+
+        # Canvas size as of the last <Configure>, and the latest note end
+        # time (None until recomputed)
+        self._canvas_w = 1
+        self._canvas_h = 1
+        self._max_end = None
+
+        # Last x and y view fractions reported by the canvas
+        self._xview = None
+        self._yview = None
 
         # Add state tracking for note manipulation
         self.dragging_note = None
+        self._drag_group = None  # Group holding dragging_note
         self.drag_start_x = 0
         self.drag_start_y = 0
         self.resize_mode = False
         self.selected_note = None
         self.last_click_time = 0
-        self.active_notes = {}
+        # note -> frequency for notes playing back; keyed by the notes
+        # themselves so a deleted note stays alive until it is released
+        self._sounding = {}
+        # The synth has one voice per frequency, so overlapping notes of the
+        # same pitch share it: frequency -> number of notes holding the voice
+        self._voice_counts = {}
+
+        # Note configuration dialog, built on first use and then reused
+        self._cfg_dialog = None
+        self._cfg_widgets = None
+        self._cfg_note = None
+        self._cfg_loaded = {}  # slider -> (note's value, value the slider shows)
+
+        # Playback runs on its own thread; the UI only polls the position
+        self._play_thread = None
+        self._play_stop = threading.Event()
+        # The playback thread only reads these snapshots, never the groups'
+        # note lists, and shares the synth with the UI thread via the lock
+        self._play_snapshots = ()
+        self._synth_lock = threading.Lock()
+        self._play_t0 = None  # Monotonic time playback last started at
+        self._drawn_position = 0
 
         # Add pan and zoom state tracking
         self.panning = False
         self.pan_start_x = 0
         self.pan_start_y = 0
+        self._pan_delta = None  # Pixels panned since the last applied pan
         self.last_scroll_time = 0
+        self._pending_zoom = None  # [x, y, factor] waiting for _apply_pending_zoom
+
+        # Wheel handlers indexed by (Control << 1) | Shift
+        self._wheel_actions = (
+            self._wheel_scroll_y,
+            self._wheel_scroll_x,
+            self._wheel_zoom,
+            self._wheel_zoom
+        )
 
         # Initialize undo/redo stacks
-        self.undo_stack = []
-        self.redo_stack = []
+        # Bounded deques drop the oldest state in O(1) once full
         self.max_undo_steps = 50
+        self.undo_stack = deque(maxlen=self.max_undo_steps)
+        self.redo_stack = deque(maxlen=self.max_undo_steps)
 
         # Create the keyboard layouts
         self.create_keyboard_layout()
@@ -194,12 +518,16 @@ class PianoRoll(tk.Frame):
         # Initialize first group
         self.create_default_group()
 
+        # Redraws are coalesced into one idle callback. Edits that only move
+        # or resize known notes queue those notes instead of a full redraw.
+        self._redraw_scheduled = False
+        self._needs_full_redraw = False
+        self._dirty_notes = {}  # note -> group for the partial redraw
+        self._in_redraw = False
+
         # Initial draw
         self.redraw()
 
-        # Start update loop
-        self.update_roll()
-
         # Bind additional controls
         self._bind_controls()
 
@@ -215,6 +543,7 @@ class PianoRoll(tk.Frame):
         self.canvas.bind('<MouseWheel>', self.on_mousewheel)  # Windows/macOS
         self.canvas.bind('<Button-4>', self.on_mousewheel)  # Linux scroll up
         self.canvas.bind('<Button-5>', self.on_mousewheel)  # Linux scroll down
+        self.canvas.bind('<Configure>', self._on_canvas_configure)
 
         # Key bindings for note manipulation
         self.bind_all('<Control-z>', self.undo)
@@ -227,6 +556,13 @@ class PianoRoll(tk.Frame):
         self.bind_all('<Shift-Left>', self.adjust_note_duration)
         self.bind_all('<Shift-Right>', self.adjust_note_duration)
 
+    def _on_canvas_configure(self, event):
+        """Redraw once the canvas is mapped or resized."""
+        self._canvas_w = event.width
+        self._canvas_h = event.height
+        self._bg_dirty = True
+        self._request_redraw()
+
     def setup_control_panel(self):
         """Set up the control panel with group, playback, and snap controls in a single row."""
         control_frame = ttk.Frame(self.control_panel)
@@ -301,72 +637,78 @@ class PianoRoll(tk.Frame):
                   command=self.zoom_in).pack(side='left', padx=2)
 
     def create_keyboard_layout(self):
-        """Create keyboard layouts on both sides of the note roll."""
-        # Clear existing keys from both frames
-        for widget in self.left_keyboard_frame.winfo_children():
-            widget.destroy()
-
+        """Create the keyboard next to the note roll, or rescale it after a zoom."""
+        canvas = self.keyboard_canvas
         key_width = 40
         key_height = self.grid_size  # Match note height
 
-        # Calculate total height needed
+        # Configure the scrollable height to match the roll
         total_height = 88 * key_height  # 88 keys
+        canvas.configure(scrollregion=(0, 0, key_width, total_height))
 
-        # Configure frame heights
-        self.left_keyboard_frame.configure(height=total_height)
-
-        # Dictionary to store both left and right piano keys
-        self.piano_keys = {'left': {}}
+        if self._key_height is not None:
+            # Keys already exist, so a zoom only stretches them
+            if key_height != self._key_height:
+                canvas.scale('key', 0, 0, 1, key_height / self._key_height)
+                self._key_height = key_height
+            return
+        self._key_height = key_height
 
-        # Create 88 keys for both keyboards (standard piano range)
+        # Create 88 keys (standard piano range)
         for i in range(88):
             midi_note = 88 - i
             note_number = midi_note % 12
             is_black = note_number in [1, 3, 6, 8, 10]
 
-            # Calculate frequency
-            freq = 440 * (2 ** ((midi_note - 69) / 12))
-
-            # Create left keyboard key
-            left_key = PianoKey(
-                self.left_keyboard_frame,
-                is_black=is_black,
-                width=key_width,
-                height=key_height
+            key = canvas.create_rectangle(
+                0, i * key_height, key_width, (i + 1) * key_height,
+                fill='black' if is_black else 'white',
+                outline='black',
+                tags=('key', f'k{midi_note}')
             )
-            left_key.place(x=0, y=i * key_height)
-
-            # Bind note playing events for both keys
-            def make_play_handler(freq, is_pressed):
-                return lambda e: self.synth.play_note(freq, is_pressed)
-
-            left_key.bind('<<KeyPressed>>', make_play_handler(freq, True))
-            left_key.bind('<<KeyReleased>>', make_play_handler(freq, False))
-
-            # Store keys in the dictionary
-            self.piano_keys['left'][midi_note] = left_key
-
-        # Make sure frames maintain their size
-        self.left_keyboard_frame.grid_propagate(False)
+            self._key_info[key] = (midi_note, is_black)
+            self.piano_keys['left'][midi_note] = key
+
+    def _on_key_press(self, event):
+        """Play the clicked key's note and show it pressed."""
+        key = self.keyboard_canvas.find_withtag('current')[0]
+        midi_note, is_black = self._key_info[key]
+        self._pressed_key = key
+        self.keyboard_canvas.itemconfigure(
+            key, fill='#666666' if is_black else '#CCCCCC')
+        with self._synth_lock:
+            self.synth.play_note(MIDI_FREQS[midi_note], True)
+
+    def _on_key_release(self, event):
+        """Stop the note of the key being held down."""
+        key = self._pressed_key
+        if key is None:
+            return
+        self._pressed_key = None
+        midi_note, is_black = self._key_info[key]
+        self.keyboard_canvas.itemconfigure(
+            key, fill='black' if is_black else 'white')
+        with self._synth_lock:
+            self.synth.play_note(MIDI_FREQS[midi_note], False)
+
+    def _on_canvas_yscroll(self, first, last):
+        """Keep the scrollbar and keyboard in step with the roll's y view."""
+        self.v_scrollbar.set(first, last)
+        self.keyboard_canvas.yview_moveto(first)
+        self._yview = (first, last)
 
     def _on_vertical_scroll(self, *args):
         """Handle vertical scrolling of both piano and canvas."""
         self.canvas.yview(*args)
-        if args[0] == 'moveto':
-            y_offset = -float(args[1]) * self.canvas.winfo_height()
-            self.left_keyboard_frame.place_configure(y=y_offset)
-        elif args[0] == 'scroll':
-            delta = int(args[1]) * int(args[2])
-            self.left_keyboard_frame.place_configure(
-                y=self.left_keyboard_frame.winfo_y() - delta)
 
     def create_default_group(self):
         """Create a default note group."""
         group_name = f"Group {self.group_counter}"
         self.group_counter += 1
-        group = NoteGroup(group_name)
+        group = NoteGroup(group_name, index=len(self.groups))
         self.groups.append(group)
         self.current_group = group
+        self.notes_changed()
         self.update_group_list()
 
     def create_new_group(self, name=None):
@@ -374,9 +716,10 @@ class PianoRoll(tk.Frame):
         if name is None:
             name = f"Group {self.group_counter}"
         self.group_counter += 1
-        group = NoteGroup(name)
+        group = NoteGroup(name, index=len(self.groups))
         self.groups.append(group)
         self.current_group = group
+        self.notes_changed()
         self.update_group_list()
         return group
 
@@ -387,11 +730,65 @@ class PianoRoll(tk.Frame):
         if self.current_group:
             self.group_list.set(self.current_group.name)
 
+    def notes_changed(self, note=None, group=None, old_end=None, index=None):
+        """Invalidate cached note data after notes were added, moved or removed.
+
+        Args:
+            note: The note that was added or updated. When given, the latest
+                note end time is raised to cover it instead of being
+                recomputed from every note on the next redraw.
+            group: The group holding the changed notes. When given, only
+                that group's arrays are invalidated.
+            old_end: The end time of an updated note before the edit. If the
+                note ended at the latest end and now ends earlier, the latest
+                end is recomputed on the next redraw.
+            index: The updated note's index in group from before the edit.
+                When given, the group patches that note's slot in its arrays
+                instead of dropping them.
+        """
+        if index is not None:
+            group.note_moved(index)
+        else:
+            for changed in (self.groups if group is None else (group,)):
+                changed.invalidate()
+        if note is None:
+            self._max_end = None
+        elif self._max_end is not None:
+            end = note.start_time + note.duration
+            if old_end is not None and old_end >= self._max_end and end < old_end:
+                self._max_end = None
+            else:
+                self._max_end = max(self._max_end, end)
+
+    def toggle_group_visibility(self, group):
+        """Show or hide a group's notes in place via its canvas tag."""
+        group.visible = not group.visible
+        state = 'normal' if group.visible else 'hidden'
+        self.canvas.itemconfigure(f'{group.tag}&&note', state=state)
+        self.canvas.itemconfigure(f'{group.tag}&&highlight',
+                                  state='hidden' if group.muted else state)
+
+    def toggle_group_mute(self, group):
+        """Mute or unmute a group, recoloring its notes via its canvas tag."""
+        group.muted = not group.muted
+        self.canvas.itemconfigure(f'{group.tag}&&note',
+                                  fill=group.muted_color if group.muted else group.color)
+        if group.visible:
+            self.canvas.itemconfigure(f'{group.tag}&&highlight',
+                                      state='hidden' if group.muted else 'normal')
+
     def on_group_selected(self, event):
         """Handle group selection change."""
         selected = self.group_list.get()
         self.current_group = next(g for g in self.groups if g.name == selected)
-        self.redraw()
+        self._request_redraw()
+
+    def _on_canvas_xscroll(self, first, last):
+        """Track the canvas x view and redraw when new notes scroll into it."""
+        self.h_scrollbar.set(first, last)
+        if (first, last) != self._xview:
+            self._xview = (first, last)
+            self._request_redraw()
 
     def _on_horizontal_scroll(self, *args):
         """Synchronize horizontal scrolling between timeline and canvas."""
@@ -404,7 +801,8 @@ class PianoRoll(tk.Frame):
         self.grid_size = min(64, int(self.grid_size * 1.2))
         if old_grid_size != self.grid_size:
             self.create_keyboard_layout()  # Changed from create_piano_keyboard
-            self.redraw()
+            self._bg_dirty = True
+            self._request_redraw()
 
     def zoom_out(self, event=None):
         """Zoom out the grid view."""
@@ -412,7 +810,8 @@ class PianoRoll(tk.Frame):
         self.grid_size = max(16, int(self.grid_size / 1.2))
         if old_grid_size != self.grid_size:
             self.create_keyboard_layout()  # Changed from create_piano_keyboard
-            self.redraw()
+            self._bg_dirty = True
+            self._request_redraw()
 
     def zoom_at_point(self, x, y, factor):
         """Zoom centered on a specific point."""
@@ -424,8 +823,8 @@ class PianoRoll(tk.Frame):
 
         if new_grid_size != old_grid_size:
             # Calculate zoom center in grid coordinates
-            canvas_width = self.canvas.winfo_width()
-            canvas_height = self.canvas.winfo_height()
+            canvas_width = self._canvas_w
+            canvas_height = self._canvas_h
 
             # Convert viewport coordinates to canvas coordinates
             canvas_x = x + self.canvas.canvasx(0)
@@ -449,26 +848,78 @@ class PianoRoll(tk.Frame):
             self.canvas.xview_moveto(new_x / (canvas_width * scale_x))
             self.canvas.yview_moveto(new_y / (canvas_height * scale_y))
 
-            self.redraw()
+            self._bg_dirty = True
+            self._request_redraw()
 
     def toggle_playback(self):
         """Toggle playback state."""
         self.is_playing = not self.is_playing
         if self.is_playing:
+            self._start_playback_thread()
+        else:
+            self._stop_playback_thread()
+            self._update_cursor()
+
+    def _start_playback_thread(self):
+        """Start stepping through the notes on a background thread."""
+        self._play_stop.clear()
+        self._publish_play_snapshots()
+        self._play_thread = threading.Thread(target=self._playback_loop, daemon=True)
+        self._play_thread.start()
+        self._poll_playback()
+
+    def _stop_playback_thread(self):
+        """Stop the playback thread and wait for it to finish."""
+        self._play_stop.set()
+        if self._play_thread is not None:
+            self._play_thread.join(timeout=1.0)
+            self._play_thread = None
+
+    def _playback_loop(self):
+        """Run playback steps against absolute deadlines until stopped.
+
+        Runs on the playback thread and never touches Tk; the UI picks up the
+        new position in _poll_playback.
+        """
+        # Anchor the step deadlines to the position playback resumed from,
+        # so they follow playing_position rather than a separate counter
+        self._play_t0 = time.monotonic()
+        first = self.playing_position
+        while not self._play_stop.is_set():
             self.play_notes()
+            target = self._play_t0 + (self.playing_position - first) * self.time_scale
+            if self._play_stop.wait(max(0.0, target - time.monotonic())):
+                break
+
+    def _publish_play_snapshots(self):
+        """Hand the playback thread snapshots of the current notes."""
+        self._play_snapshots = tuple((group, group.snapshot()) for group in self.groups)
+
+    def _poll_playback(self):
+        """Redraw the cursor whenever the playback thread has advanced."""
+        if not self.is_playing:
+            return
+        self._publish_play_snapshots()
+        if self.playing_position != self._drawn_position:
+            self._drawn_position = self.playing_position
+            self._update_cursor()
+        self.after(30, self._poll_playback)
 
     def stop_all_notes(self):
         """Stop all currently playing notes."""
-        for freq in self.active_notes:
-            self.synth.play_note(freq, False)
-        self.active_notes.clear()
+        with self._synth_lock:
+            for frequency in self._voice_counts:
+                self.synth.play_note(frequency, False)
+            self._voice_counts.clear()
+            self._sounding.clear()
 
     def reset_playback(self):
         """Reset playback position and stop all notes."""
+        self.is_playing = False
+        self._stop_playback_thread()
         self.playing_position = 0
         self.stop_all_notes()
-        self.is_playing = False
-        self.redraw()
+        self._update_cursor()
 
     def add_snap_controls(self):
         """Add snapping controls to the control panel."""
@@ -530,14 +981,14 @@ class PianoRoll(tk.Frame):
     def update_snap_mode(self, event=None):
         """Update the snapping mode."""
         self.snap_settings['mode'] = self.snap_mode.get()
-        self.redraw()
+        self._request_redraw()
 
     def update_grid_division(self):
         """Update the grid division value."""
         try:
             value = int(self.grid_div.get())
             self.snap_settings['grid_division'] = max(1, min(16, value))
-            self.redraw()
+            self._request_redraw()
         except ValueError:
             pass
 
@@ -545,30 +996,39 @@ class PianoRoll(tk.Frame):
         """Toggle magnetic snapping to nearby notes."""
         self.snap_settings['magnetic_snap'] = not self.snap_settings['magnetic_snap']
 
-    def get_snap_position(self, x, y):
-        """Get the snapped position for x and y coordinates."""
+    def _ticks_per_cell(self):
+        """Get the number of snap ticks per grid cell, or None when snapping freely."""
         if not self.snap_settings['enabled']:
-            return x, y
-
-        # Convert coordinates to time and note values
-        time_value = (x / self.grid_size) * self.time_scale
-        midi_note = 88 - int(y / self.grid_size)
-
-        # Handle different snap modes
+            return None
         if self.snap_settings['mode'] == 'grid':
-            # Snap to grid divisions
-            division_time = self.time_scale / self.snap_settings['grid_division']
-            snapped_time = round(time_value / division_time) * division_time
-            snapped_x = int((snapped_time / self.time_scale) * self.grid_size)
+            return self.snap_settings['grid_division']
+        if self.snap_settings['mode'] == 'triplet':
+            # Triplet mode divides each grid cell into four parts
+            return 4
+        return None
 
-        elif self.snap_settings['mode'] == 'triplet':
-            # Snap to triplet divisions (divide grid into four parts)
-            triplet_time = self.time_scale / 4
-            snapped_time = round(time_value / triplet_time) * triplet_time
-            snapped_x = int((snapped_time / self.time_scale) * self.grid_size)
+    def get_snap_position(self, x, y):
+        """Get the snapped position for x and y coordinates.
+
+        When x snaps to a tick, the time is computed from the integer tick
+        rather than from the pixel, so snapped notes land exactly on the
+        grid even when a tick isn't a whole number of pixels wide.
 
+        Returns:
+            tuple: The snapped x and y and the time in seconds at snapped x
+        """
+        if not self.snap_settings['enabled']:
+            return x, y, (x / self.grid_size) * self.time_scale
+
+        # Snap X to the nearest whole tick of the current snap mode
+        ticks_per_cell = self._ticks_per_cell()
+        if ticks_per_cell:
+            tick = round(x * ticks_per_cell / self.grid_size)
+            snapped_x = tick * self.grid_size // ticks_per_cell
+            snapped_time = tick * self.time_scale / ticks_per_cell
         else:  # free mode
             snapped_x = x
+            snapped_time = (x / self.grid_size) * self.time_scale
 
         # Snap Y to exact semitone positions
         snapped_y = int(round(y / self.grid_size) * self.grid_size)
@@ -578,43 +1038,41 @@ class PianoRoll(tk.Frame):
             threshold_pixels = self.snap_settings['magnetic_threshold']
             closest_snap = None
             min_distance = float('inf')
+            gs = self.grid_size
+            px_per_sec = gs / self.time_scale
 
             for group in self.groups:
-                for note in group.notes:
-                    if note == self.dragging_note:
-                        continue
-
-                    # Get note edges in pixels
-                    note_start_x = int((note.start_time / self.time_scale) * self.grid_size)
-                    note_end_x = int(((note.start_time + note.duration) / self.time_scale) * self.grid_size)
-                    note_y = int((88 - round(12 * np.log2(note.frequency/440) + 69)) * self.grid_size)
-
-                    # Only check notes in the same row or adjacent rows
-                    if abs(note_y - snapped_y) <= self.grid_size:
-                        # Check start edge
-                        if abs(note_start_x - snapped_x) < threshold_pixels:
-                            dist = abs(note_start_x - snapped_x)
-                            if dist < min_distance:
-                                min_distance = dist
-                                closest_snap = note_start_x
-
-                        # Check end edge
-                        if abs(note_end_x - snapped_x) < threshold_pixels:
-                            dist = abs(note_end_x - snapped_x)
-                            if dist < min_distance:
-                                min_distance = dist
-                                closest_snap = note_end_x
+                if not group.notes:
+                    continue
+
+                # Find the nearest note edge in the same or adjacent rows
+                # among the notes near x, skipping the dragged note
+                arrays = group.note_arrays()
+                lo, hi = group.window((snapped_x - threshold_pixels) / px_per_sec,
+                                      (snapped_x + threshold_pixels + 1) / px_per_sec)
+                exclude = (group.index_of(self.dragging_note) - lo
+                           if group is self._drag_group else -1)
+                dist, edge_x = nearest_edge(
+                    arrays['start'][lo:hi], arrays['dur'][lo:hi], arrays['midi'][lo:hi],
+                    px_per_sec, gs, snapped_x, snapped_y, exclude
+                )
+                if dist < threshold_pixels and dist < min_distance:
+                    min_distance = dist
+                    closest_snap = int(edge_x)
 
             if closest_snap is not None:
+                # The edge may lie between ticks; use its own time
                 snapped_x = closest_snap
+                snapped_time = closest_snap / px_per_sec
 
-        return snapped_x, snapped_y
+        return snapped_x, snapped_y, snapped_time
 
     def adjust_note_duration(self, event):
         """Adjust note duration with Shift+Left/Right."""
         if not self.selected_note:
             return
 
+        old_end = self.selected_note.start_time + self.selected_note.duration
         if event.keysym == 'Left':
             self.selected_note.duration = max(
                 self.time_scale,
@@ -623,53 +1081,59 @@ class PianoRoll(tk.Frame):
         else:  # Right
             self.selected_note.duration += self.time_scale
 
+        self.notes_changed(self.selected_note, old_end=old_end)
         self.save_state()
-        self.redraw()
+        self._request_redraw()
 
     def play_notes(self):
-        """Play notes at current position."""
+        """Play notes at current position and advance one step.
+
+        Called from the playback thread.
+        """
         if not self.is_playing:
             return
 
         current_time = self.playing_position * self.time_scale
-        next_time = (self.playing_position + 1) * self.time_scale
+        synth = self.synth
+        sounding = self._sounding
+        voice_counts = self._voice_counts
 
-        # Stop notes that should end
-        notes_to_stop = []
-        for freq, note in self.active_notes.items():
-            if note.start_time + note.duration <= current_time:
-                self.synth.play_note(freq, False)
-                notes_to_stop.append(freq)
-
-        # Remove stopped notes from active notes
-        for freq in notes_to_stop:
-            del self.active_notes[freq]
-
-        # Play new notes
-        for group in self.groups:
+        # Collect the notes that sound during this step
+        active = set()
+        for group, snapshot in self._play_snapshots:
             if group.visible and not group.muted:
-                for note in group.notes:
-                    # Check if note should start playing
-                    if (note.start_time <= current_time < note.start_time + note.duration and
-                        note.frequency not in self.active_notes):
-                        # Configure synth with note settings
-                        self.synth.set_waveform(note.waveform)
-                        self.synth.set_adsr(**note.adsr)
-                        for effect, params in note.effects.items():
-                            self.synth.toggle_effect(effect, params['enabled'])
-                            if params['enabled']:
-                                for param, value in params.items():
-                                    if param != 'enabled':
-                                        self.synth.set_effect_param(
-                                            f"{effect}_{param}", value)
-
-                        # Play the note
-                        self.synth.play_note(note.frequency, True, note.velocity)
-                        self.active_notes[note.frequency] = note
+                active.update(snapshot.notes_at(current_time))
+
+        with self._synth_lock:
+            # Release notes that stopped sounding, freeing a voice once the
+            # last note holding its frequency has ended
+            for note in sounding.keys() - active:
+                frequency = sounding.pop(note)
+                count = voice_counts[frequency] - 1
+                if count:
+                    voice_counts[frequency] = count
+                else:
+                    del voice_counts[frequency]
+                    synth.play_note(frequency, False)
+
+            # Configure the synth only on note-on; held notes need no updates
+            for note in active - sounding.keys():
+                frequency = note.frequency
+                count = voice_counts.get(frequency, 0)
+                if not count:
+                    synth.set_waveform(note.waveform)
+                    synth.set_adsr(**note.adsr)
+                    for effect, enabled, params in note.effect_cmds:
+                        synth.toggle_effect(effect, enabled)
+                        if enabled:
+                            for param, value in params:
+                                synth.set_effect_param(param, value)
+
+                    synth.play_note(frequency, True, note.velocity)
+                voice_counts[frequency] = count + 1
+                sounding[note] = frequency
 
         self.playing_position += 1
-        self.redraw()
-        self.after(int(self.time_scale * 1000), self.play_notes)
 
     def on_canvas_click(self, event):
         """Handle canvas click event."""
@@ -677,8 +1141,7 @@ class PianoRoll(tk.Frame):
         y = self.canvas.canvasy(event.y)
 
         # Get snapped position
-        snapped_x, snapped_y = self.get_snap_position(x, y)
-        time_pos = (snapped_x / self.grid_size) * self.time_scale
+        snapped_x, snapped_y, time_pos = self.get_snap_position(x, y)
         midi_note = 88 - int(snapped_y / self.grid_size)
 
         # Check for double click
@@ -690,9 +1153,10 @@ class PianoRoll(tk.Frame):
         self.last_click_time = current_time
 
         # Check if clicking on an existing note
-        clicked_note = self.find_note_at(x, y)
+        clicked_group, clicked_note = self._hit_test(x, y)
         if clicked_note:
             self.dragging_note = clicked_note
+            self._drag_group = clicked_group
             self.drag_start_x = snapped_x
             self.drag_start_y = snapped_y
 
@@ -704,31 +1168,27 @@ class PianoRoll(tk.Frame):
         else:
             # Create new note at snapped position
             if 0 <= midi_note <= 127:
-                freq = 440 * (2 ** ((midi_note - 69) / 12))
+                freq = MIDI_FREQS[midi_note]
                 note = Note(
                     frequency=freq,
                     start_time=time_pos,
                     duration=self.time_scale,
                     velocity=1.0,
-                    waveform='sine',
-                    adsr={'attack': 0.1, 'decay': 0.1, 'sustain': 0.7, 'release': 0.2},
-                    effects={
-                        'tremolo': {'enabled': False, 'rate': 5, 'depth': 0.3},
-                        'delay': {'enabled': False, 'time': 0.1, 'feedback': 0.3},
-                        'reverb': {'enabled': False, 'size': 0.3}
-                    }
+                    waveform='sine'
                 )
 
                 if self.current_group is None:
                     self.create_default_group()
 
-                self.current_group.notes.append(note)
+                self.current_group.add_note(note)
+                self.notes_changed(note, self.current_group)
                 self.selected_note = note
                 self.dragging_note = note
+                self._drag_group = self.current_group
                 self.resize_mode = True
                 self.save_state()
 
-        self.redraw()
+        self._request_redraw()
 
     def on_drag(self, event):
         """Handle dragging of notes."""
@@ -739,14 +1199,16 @@ class PianoRoll(tk.Frame):
         y = self.canvas.canvasy(event.y)
 
         # Get snapped position
-        snapped_x, snapped_y = self.get_snap_position(x, y)
+        snapped_x, snapped_y, snapped_time = self.get_snap_position(x, y)
+        old_end = self.dragging_note.start_time + self.dragging_note.duration
+        index = (self._drag_group.index_of(self.dragging_note)
+                 if self._drag_group is not None else -1)
 
         if self.resize_mode:
             # Calculate new duration based on snapped position
-            note_start_x = int((self.dragging_note.start_time / self.time_scale) * self.grid_size)
             new_duration = max(
                 self.time_scale,
-                ((snapped_x - note_start_x) / self.grid_size) * self.time_scale
+                snapped_time - self.dragging_note.start_time
             )
             self.dragging_note.duration = new_duration
         else:
@@ -755,40 +1217,45 @@ class PianoRoll(tk.Frame):
             dy = snapped_y - self.drag_start_y
 
             # Update note position
-            new_time = max(0, (snapped_x / self.grid_size) * self.time_scale)
+            new_time = max(0, snapped_time)
             new_midi = 88 - int(snapped_y / self.grid_size)
 
             if 0 <= new_midi <= 127:  # Ensure valid MIDI note range
                 self.dragging_note.start_time = new_time
-                self.dragging_note.frequency = 440 * (2 ** ((new_midi - 69) / 12))
+                self.dragging_note.frequency = MIDI_FREQS[new_midi]
 
                 # Update drag start position
                 self.drag_start_x = snapped_x
                 self.drag_start_y = snapped_y
 
-        self.redraw()
+        self.notes_changed(self.dragging_note, self._drag_group, old_end,
+                           index if index >= 0 else None)
+        self._request_note_redraw(self.dragging_note, self._drag_group)
 
-    def save_state(self):
-        """Save current state for undo."""
-        # Create a snapshot of current notes
+    def _snapshot(self):
+        """Capture the notes of every group for undo and redo.
+
+        Each group is stored as its start, duration and frequency arrays
+        plus per-note lists of the remaining settings. The arrays are
+        replaced rather than modified when notes change, and note settings
+        dicts are never mutated, so both are kept by reference.
+        """
         state = []
         for group in self.groups:
-            group_state = []
-            for note in group.notes:
-                group_state.append({
-                    'frequency': note.frequency,
-                    'start_time': note.start_time,
-                    'duration': note.duration,
-                    'velocity': note.velocity,
-                    'waveform': note.waveform,
-                    'adsr': note.adsr.copy(),
-                    'effects': {k: v.copy() for k, v in note.effects.items()}
-                })
-            state.append(group_state)
+            arrays = group.note_arrays()
+            notes = group.notes
+            state.append((
+                arrays['start'], arrays['dur'], arrays['freq'],
+                [note.velocity for note in notes],
+                [note.waveform for note in notes],
+                [note.adsr for note in notes],
+                [note.effects for note in notes]
+            ))
+        return state
 
-        self.undo_stack.append(state)
-        if len(self.undo_stack) > self.max_undo_steps:
-            self.undo_stack.pop(0)
+    def save_state(self):
+        """Save current state for undo."""
+        self.undo_stack.append(self._snapshot())
         self.redo_stack.clear()
 
     def on_right_click(self, event):
@@ -816,22 +1283,31 @@ class PianoRoll(tk.Frame):
         dx = self.pan_start_x - event.x
         dy = self.pan_start_y - event.y
 
-        # Get current scroll positions
-        x_view = self.canvas.xview()
-        y_view = self.canvas.yview()
-
-        # Calculate movement based on canvas size
-        canvas_width = self.canvas.winfo_width()
-        canvas_height = self.canvas.winfo_height()
-
-        # Move view
-        self.canvas.xview_moveto(x_view[0] + dx/canvas_width)
-        self.canvas.yview_moveto(y_view[0] + dy/canvas_height)
+        # Accumulate the motion and move the view once per idle cycle
+        if self._pan_delta is None:
+            self._pan_delta = [dx, dy]
+            self.after_idle(self._apply_pan)
+        else:
+            self._pan_delta[0] += dx
+            self._pan_delta[1] += dy
 
         # Update start position
         self.pan_start_x = event.x
         self.pan_start_y = event.y
 
+    def _apply_pan(self):
+        """Move the view by the motion accumulated by on_pan."""
+        dx, dy = self._pan_delta
+        self._pan_delta = None
+
+        # Get current scroll positions, as last reported by the canvas
+        x_first = float(self._xview[0]) if self._xview else self.canvas.xview()[0]
+        y_first = float(self._yview[0]) if self._yview else self.canvas.yview()[0]
+
+        # Move view, scaled by the cached canvas size
+        self.canvas.xview_moveto(x_first + dx/self._canvas_w)
+        self.canvas.yview_moveto(y_first + dy/self._canvas_h)
+
     def stop_pan(self, event):
         """Stop panning."""
         self.panning = False
@@ -839,53 +1315,69 @@ class PianoRoll(tk.Frame):
 
     def on_mousewheel(self, event):
         """Handle mousewheel for zooming and scrolling."""
-        if event.state & 4:  # Control key is pressed (zoom)
-            # Get current time to handle acceleration
-            current_time = event.time
-            if current_time - self.last_scroll_time < 50:  # 50ms threshold
-                zoom_factor = 1.2  # Faster zoom when scrolling quickly
-            else:
-                zoom_factor = 1.1  # Normal zoom speed
-            self.last_scroll_time = current_time
-
-            # Get mouse position for zoom focus
-            x = self.canvas.canvasx(event.x)
-            y = self.canvas.canvasy(event.y)
-
-            # Determine zoom direction
-            if event.delta > 0 or event.num == 4:  # Zoom in
-                self.zoom_at_point(x, y, zoom_factor)
-            else:  # Zoom out
-                self.zoom_at_point(x, y, 1/zoom_factor)
-        else:  # Normal scroll
-            if event.state & 1:  # Shift is pressed (horizontal scroll)
-                if event.delta > 0 or event.num == 4:
-                    self.canvas.xview_scroll(-1, 'units')
-                else:
-                    self.canvas.xview_scroll(1, 'units')
-            else:  # Vertical scroll
-                if event.delta > 0 or event.num == 4:
-                    self.canvas.yview_scroll(-1, 'units')
-                else:
-                    self.canvas.yview_scroll(1, 'units')
+        # Linux reports the wheel as buttons 4 and 5, others as a delta
+        direction = _WHEEL_DIRS.get(event.num, 1 if event.delta > 0 else -1)
+
+        # Control zooms, Shift scrolls horizontally, otherwise scroll vertically
+        mode = (event.state & 4) >> 1 | (event.state & 1)
+        self._wheel_actions[mode](direction, event)
+
+    def _wheel_scroll_y(self, direction, event):
+        """Scroll vertically, up for a positive wheel direction."""
+        self.canvas.yview_scroll(-direction, 'units')
+
+    def _wheel_scroll_x(self, direction, event):
+        """Scroll horizontally, left for a positive wheel direction."""
+        self.canvas.xview_scroll(-direction, 'units')
+
+    def _wheel_zoom(self, direction, event):
+        """Zoom around the mouse, in for a positive wheel direction."""
+        # Zoom faster when the wheel turns quickly
+        current_time = event.time
+        if current_time - self.last_scroll_time < 50:  # 50ms threshold
+            zoom_factor = 1.2
+        else:
+            zoom_factor = 1.1
+        self.last_scroll_time = current_time
+
+        # Get mouse position for zoom focus
+        x = self.canvas.canvasx(event.x)
+        y = self.canvas.canvasy(event.y)
+        factor = zoom_factor if direction > 0 else 1/zoom_factor
+
+        # Compose the wheel steps of a gesture and zoom once they pause
+        if self._pending_zoom is None:
+            self._pending_zoom = [x, y, factor]
+            self.after(20, self._apply_pending_zoom)
+        else:
+            self._pending_zoom[0] = x
+            self._pending_zoom[1] = y
+            self._pending_zoom[2] *= factor
+
+    def _apply_pending_zoom(self):
+        """Zoom by the factor accumulated from the wheel since the last zoom."""
+        x, y, factor = self._pending_zoom
+        self._pending_zoom = None
+        self.zoom_at_point(x, y, factor)
 
     def move_selected_note(self, dx=0, dy=0):
         """Move selected note by grid units."""
         if self.selected_note:
+            old_end = self.selected_note.start_time + self.selected_note.duration
+
             # Calculate time and pitch changes
             time_delta = dx * self.time_scale
             new_time = max(0, self.selected_note.start_time + time_delta)
 
             # Calculate new frequency from semitone change
-            if dy != 0:
-                midi_note = round(12 * np.log2(self.selected_note.frequency/440) + 69)
-                new_midi = midi_note + dy
-                new_freq = 440 * (2 ** ((new_midi - 69) / 12))
-                self.selected_note.frequency = new_freq
+            new_midi = self.selected_note.midi + dy
+            if dy != 0 and 0 <= new_midi <= 127:
+                self.selected_note.frequency = MIDI_FREQS[new_midi]
 
             self.selected_note.start_time = new_time
+            self.notes_changed(self.selected_note, old_end=old_end)
             self.save_state()  # Save for undo
-            self.redraw()
+            self._request_redraw()
 
     def move_selected_note_left(self, event):
         """Move selected note left one grid unit."""
@@ -906,6 +1398,7 @@ class PianoRoll(tk.Frame):
     def on_release(self, event):
         """Handle end of drag operation."""
         self.dragging_note = None
+        self._drag_group = None
         self.resize_mode = False
         # Stop any notes that were being played
         self.stop_all_notes()
@@ -915,7 +1408,7 @@ class PianoRoll(tk.Frame):
         note = self.find_note_at(x, y)
         if note:
             self.selected_note = note
-            self.redraw()
+            self._request_redraw()
 
     def undo(self, event=None):
         """Undo last action."""
@@ -923,21 +1416,7 @@ class PianoRoll(tk.Frame):
             return
 
         # Save current state to redo stack
-        current_state = []
-        for group in self.groups:
-            group_state = []
-            for note in group.notes:
-                group_state.append({
-                    'frequency': note.frequency,
-                    'start_time': note.start_time,
-                    'duration': note.duration,
-                    'velocity': note.velocity,
-                    'waveform': note.waveform,
-                    'adsr': note.adsr.copy(),
-                    'effects': {k: v.copy() for k, v in note.effects.items()}
-                })
-            current_state.append(group_state)
-        self.redo_stack.append(current_state)
+        self.redo_stack.append(self._snapshot())
 
         # Restore previous state
         state = self.undo_stack.pop()
@@ -949,21 +1428,7 @@ class PianoRoll(tk.Frame):
             return
 
         # Save current state to undo stack
-        current_state = []
-        for group in self.groups:
-            group_state = []
-            for note in group.notes:
-                group_state.append({
-                    'frequency': note.frequency,
-                    'start_time': note.start_time,
-                    'duration': note.duration,
-                    'velocity': note.velocity,
-                    'waveform': note.waveform,
-                    'adsr': note.adsr.copy(),
-                    'effects': {k: v.copy() for k, v in note.effects.items()}
-                })
-            current_state.append(group_state)
-        self.undo_stack.append(current_state)
+        self.undo_stack.append(self._snapshot())
 
         # Restore redo state
         state = self.redo_stack.pop()
@@ -979,37 +1444,55 @@ class PianoRoll(tk.Frame):
         for group_idx, group_state in enumerate(state):
             if group_idx >= len(self.groups):
                 self.create_new_group()
-            for note_data in group_state:
-                note = Note(
-                    frequency=note_data['frequency'],
-                    start_time=note_data['start_time'],
-                    duration=note_data['duration'],
-                    velocity=note_data['velocity'],
-                    waveform=note_data['waveform'],
-                    adsr=note_data['adsr'],
-                    effects=note_data['effects']
-                )
-                self.groups[group_idx].notes.append(note)
+            starts, durs, freqs, velocities, waveforms, adsrs, effects = group_state
+            self.groups[group_idx].notes.extend(
+                Note(frequency, start_time, duration, velocity, waveform, adsr, fx)
+                for frequency, start_time, duration, velocity, waveform, adsr, fx
+                in zip(freqs.tolist(), starts.tolist(), durs.tolist(),
+                       velocities, waveforms, adsrs, effects)
+            )
 
-        self.redraw()
+        self.notes_changed()
+        self._request_redraw()
 
     def find_note_at(self, x, y):
         """Find a note at the given canvas coordinates."""
+        return self._hit_test(x, y)[1]
+
+    def _hit_test(self, x, y):
+        """Find a note and its group at the given canvas coordinates.
+
+        Returns:
+            tuple: The group and the note, or (None, None) if there is none
+        """
         time_pos = (x / self.grid_size) * self.time_scale
         midi_note = 88 - int(y / self.grid_size)
 
         time_tolerance = 0
 
         for group in self.groups:
-            for note in group.notes:
-                note_midi = round(12 * np.log2(note.frequency/440) + 69)
+            if not group.notes:
+                continue
+            lo, hi = group.window(time_pos - time_tolerance, time_pos + time_tolerance)
+            if hi - lo > ACTIVE_SCAN_THRESHOLD:
+                # Test the whole window at once and take the first hit
+                arrays = group.note_arrays()
+                starts = arrays['start'][lo:hi]
+                mask = ((np.abs(arrays['midi'][lo:hi] - midi_note) <= 1) &
+                        (starts - time_tolerance <= time_pos) &
+                        (time_pos <= starts + arrays['dur'][lo:hi] + time_tolerance))
+                if mask.any():
+                    return group, group.notes[lo + int(mask.argmax())]
+                continue
+            for note in group.notes[lo:hi]:
+                note_midi = note.midi
                 note_start = note.start_time
                 note_end = note.start_time + note.duration
 
                 if (abs(note_midi - midi_note) <= 1 and  # Within one semitone
                     note_start - time_tolerance <= time_pos <= note_end + time_tolerance):
-                    return note
-        return None
+                    return group, note
+        return None, None
 
     def delete_selected_note(self, event=None):
         """Delete the selected note."""
@@ -1017,8 +1500,9 @@ class PianoRoll(tk.Frame):
             for group in self.groups:
                 if self.selected_note in group.notes:
                     group.notes.remove(self.selected_note)
+                    self.notes_changed()
                     self.selected_note = None
-                    self.redraw()
+                    self._request_redraw()
                     break
 
     def show_note_context_menu(self, event):
@@ -1034,92 +1518,171 @@ class PianoRoll(tk.Frame):
         y = self.canvas.canvasy(event.y)
 
         time_pos = (x // self.grid_size) * self.time_scale
-        for note in self.current_group.notes:
-            if (note.start_time <= time_pos and
-                note.start_time + note.duration > time_pos):
-                self.open_note_config_dialog(note)
-                break
+        hits = self.current_group.notes_at(time_pos)
+        if hits:
+            self.open_note_config_dialog(hits[0])
 
     def open_note_config_dialog(self, note):
-        """Open dialog for configuring note parameters."""
+        """Open dialog for configuring note parameters.
+
+        The dialog is shown from an idle callback, so the menu or click that
+        opened it finishes first.
+        """
+        self.after_idle(self._show_note_config_dialog, note)
+
+    def _show_note_config_dialog(self, note):
+        """Build the dialog if needed, load the note's settings and show it."""
+        if self._cfg_dialog is None:
+            self._build_note_config_dialog()
+
+        # Load the note's settings into the dialog's widgets. Sliders clip
+        # what they are set to, so remember each note value next to the value
+        # shown; sliders left untouched then keep the note's value
+        widgets = self._cfg_widgets
+        loaded = self._cfg_loaded
+        loaded.clear()
+        widgets['waveform'].set(note.waveform)
+        for param, scale in widgets['adsr'].items():
+            value = note.adsr.get(param, DEFAULT_ADSR[param])
+            scale.set(value)
+            loaded[scale] = (value, float(scale.get()))
+        for effect, params in widgets['effects'].items():
+            settings = note.effects.get(effect, DEFAULT_EFFECTS[effect])
+            for param, widget in params.items():
+                value = settings.get(param, DEFAULT_EFFECTS[effect][param])
+                if param == 'enabled':
+                    widget.state(['!alternate', 'selected' if value else '!selected'])
+                else:
+                    widget.set(value)
+                    loaded[widget] = (value, float(widget.get()))
+
+        self._cfg_note = note
+        self._cfg_dialog.deiconify()
+        self._cfg_dialog.lift()
+
+    def _build_note_config_dialog(self):
+        """Create the note configuration dialog, which is reused while hidden.
+
+        The widgets are read directly when the settings are applied, so no
+        Tk variables are traced while the sliders move.
+        """
         dialog = tk.Toplevel(self)
         dialog.title("Note Configuration")
+        dialog.protocol("WM_DELETE_WINDOW", dialog.withdraw)
 
         # Waveform selection
         ttk.Label(dialog, text="Waveform:").grid(row=0, column=0, padx=5, pady=5)
-        waveform_var = tk.StringVar(value=note.waveform)
-        ttk.Combobox(dialog, textvariable=waveform_var,
+        waveform_box = ttk.Combobox(dialog,
                     values=['sine', 'square', 'triangle', 'saw'],
-                    state='readonly').grid(row=0, column=1, padx=5, pady=5)
+                    state='readonly')
+        waveform_box.grid(row=0, column=1, padx=5, pady=5)
 
         # ADSR controls
         adsr_frame = ttk.LabelFrame(dialog, text="ADSR")
         adsr_frame.grid(row=1, column=0, columnspan=2, padx=5, pady=5)
 
-        adsr_vars = {}
-        for i, (param, value) in enumerate(note.adsr.items()):
+        adsr_widgets = {}
+        for i, param in enumerate(DEFAULT_ADSR):
             ttk.Label(adsr_frame, text=param.title()).grid(row=i, column=0, padx=5)
-            var = tk.DoubleVar(value=value)
-            adsr_vars[param] = var
-            ttk.Scale(adsr_frame, from_=0.01, to=1.0, variable=var,
-                     orient='horizontal').grid(row=i, column=1, padx=5)
+            scale = ttk.Scale(adsr_frame, from_=0.01, to=1.0, orient='horizontal')
+            scale.grid(row=i, column=1, padx=5)
+            adsr_widgets[param] = scale
 
         # Effects controls
         effects_frame = ttk.LabelFrame(dialog, text="Effects")
         effects_frame.grid(row=2, column=0, columnspan=2, padx=5, pady=5)
 
-        effect_vars = {}
-        for i, (effect, params) in enumerate(note.effects.items()):
+        effect_widgets = {}
+        for i, (effect, params) in enumerate(DEFAULT_EFFECTS.items()):
             frame = ttk.LabelFrame(effects_frame, text=effect.title())
             frame.grid(row=i, column=0, columnspan=2, padx=5, pady=5)
 
-            effect_vars[effect] = {}
+            effect_widgets[effect] = {}
 
             # Enable/disable checkbox
-            enabled_var = tk.BooleanVar(value=params['enabled'])
-            effect_vars[effect]['enabled'] = enabled_var
-            ttk.Checkbutton(frame, text="Enabled",
-                           variable=enabled_var).grid(row=0, column=0, padx=5)
+            enabled_box = ttk.Checkbutton(frame, text="Enabled")
+            enabled_box.grid(row=0, column=0, padx=5)
+            effect_widgets[effect]['enabled'] = enabled_box
 
             # Effect parameters
-            for j, (param, value) in enumerate(params.items()):
+            for j, param in enumerate(params):
                 if param != 'enabled':
                     ttk.Label(frame, text=param.title()).grid(row=j+1, column=0, padx=5)
-                    var = tk.DoubleVar(value=value)
-                    effect_vars[effect][param] = var
-                    ttk.Scale(frame, from_=0.01, to=1.0, variable=var,
-                             orient='horizontal').grid(row=j+1, column=1, padx=5)
-
-        def apply_config():
-            note.waveform = waveform_var.get()
-            note.adsr = {k: v.get() for k, v in adsr_vars.items()}
-            note.effects = {
-                effect: {
-                    param: var.get()
-                    for param, var in params.items()
-                }
-                for effect, params in effect_vars.items()
-            }
-            dialog.destroy()
-            self.redraw()
+                    scale = ttk.Scale(frame, from_=0.01, to=1.0, orient='horizontal')
+                    scale.grid(row=j+1, column=1, padx=5)
+                    effect_widgets[effect][param] = scale
 
-        ttk.Button(dialog, text="Apply", command=apply_config).grid(
+        ttk.Button(dialog, text="Apply", command=self._apply_note_config).grid(
             row=3, column=0, columnspan=2, pady=10)
 
+        self._cfg_dialog = dialog
+        self._cfg_widgets = {
+            'waveform': waveform_box,
+            'adsr': adsr_widgets,
+            'effects': effect_widgets
+        }
+
+    def _apply_note_config(self):
+        """Write the dialog's settings back to the note being configured."""
+        note = self._cfg_note
+        widgets = self._cfg_widgets
+        loaded = self._cfg_loaded
+
+        def scale_value(scale):
+            original, shown = loaded[scale]
+            value = float(scale.get())
+            return original if value == shown else value
+
+        if note is not None:
+            note.waveform = widgets['waveform'].get()
+            # Edited settings are read-only like the defaults, so snapshots
+            # and other notes can keep sharing them by reference
+            note.adsr = MappingProxyType(
+                {k: scale_value(w) for k, w in widgets['adsr'].items()})
+            note.effects = MappingProxyType({
+                effect: MappingProxyType({
+                    param: (widget.instate(['selected']) if param == 'enabled'
+                            else scale_value(widget))
+                    for param, widget in params.items()
+                })
+                for effect, params in widgets['effects'].items()
+            })
+            note.rebuild_effect_cmds()
+        self._cfg_note = None
+        self._cfg_dialog.withdraw()
+        self._request_redraw()
+
     def redraw(self):
-        """Redraw the entire piano roll."""
-        self.canvas.delete('all')
-        self.timeline.delete('all')
+        """Redraw the piano roll, rebuilding the background only when needed."""
+        if self._in_redraw:
+            return
+
+        # A full redraw satisfies any pending request, so a scheduled
+        # redraw after a direct call does nothing
+        self._needs_full_redraw = False
+        self._dirty_notes.clear()
+
+        self._in_redraw = True
+        try:
+            self._redraw()
+        finally:
+            self._in_redraw = False
 
+    def _redraw(self):
+        """Resize the scroll regions and render the background and foreground."""
         # Calculate dimensions
-        min_width = self.canvas.winfo_width()
+        min_width = self._canvas_w
+        if min_width <= 1:
+            # Not mapped yet; the <Configure> binding redraws once it is
+            return
+
         if any(group.notes for group in self.groups):
-            max_time = max(
-                (note.start_time + note.duration
-                for group in self.groups
-                for note in group.notes),
-                default=4
-            )
+            if self._max_end is None:
+                # Refresh each group's arrays, which also updates its max_end
+                for group in self.groups:
+                    group.note_arrays()
+                self._max_end = max(group.max_end for group in self.groups if group.notes)
+            max_time = self._max_end
             width = max(
                 min_width,
                 int((max_time / self.time_scale) * self.grid_size + self.grid_size * 4)
@@ -1129,179 +1692,314 @@ class PianoRoll(tk.Frame):
 
         height = 88 * self.grid_size  # 88 piano keys
 
-        # Draw grid
+        # Only touch the scroll regions when the content size changes
+        if (width, height) != self._scroll_size:
+            self._scroll_size = (width, height)
+            self.canvas.configure(scrollregion=(0, 0, width, height))
+            self.timeline.configure(scrollregion=(0, 0, width, 30))
+            self._bg_dirty = True
+
+        if self._bg_dirty:
+            self._render_background(width, height)
+        self._render_foreground(width, height)
+
+    def _render_background(self, width, height):
+        """Rebuild the static grid layer."""
+        self.canvas.delete('bg')
         self._draw_grid(width, height)
+        self.canvas.tag_lower('bg')
+        self._bg_dirty = False
 
-        # Draw playback position line
-        if self.is_playing:
-            play_x = int((self.playing_position * self.time_scale / self.time_scale) * self.grid_size)
-            self.canvas.create_line(
-                play_x, 0, play_x, height,
-                fill='#00FF00',
-                width=2,
-                dash=(4, 4)
-            )
+    def _render_foreground(self, width, height):
+        """Update the notes and playback cursor on top of the grid."""
+        self._draw_notes(width, height)
+        self.canvas.tag_raise(self._cursor)
+        self._update_cursor()
 
-        # Draw notes with grid alignment
-        subdivision = (self.snap_settings['grid_division']
-                    if self.snap_settings['mode'] == 'grid'
-                    else 3 if self.snap_settings['mode'] == 'triplet'
-                    else 1)
-        grid_unit = self.grid_size / subdivision
+    def _update_cursor(self):
+        """Move the persistent playback cursor lines to the current position."""
+        if self.is_playing:
+            play_x = self.playing_position * self.grid_size
+            self.canvas.coords(self._cursor, play_x, 0, play_x, 88 * self.grid_size)
+            self.timeline.coords(self._timeline_cursor, play_x, 0, play_x, 30)
 
-        for group in self.groups:
-            if group.visible:
-                for note in group.notes:
-                    # Align note position to grid
-                    x1 = int((note.start_time / self.time_scale) * self.grid_size + grid_unit/2)
-                    x2 = int(((note.start_time + note.duration) / self.time_scale) * self.grid_size + grid_unit/2)
-
-                    # Calculate y position from frequency with grid alignment
-                    midi_note = round(12 * np.log2(note.frequency/440) + 69)
-                    y = (88 - midi_note) * self.grid_size + self.grid_size/2
-
-                    # Draw note rectangle
-                    fill_color = '#666666' if group.muted else group.color
-                    outline_color = 'white' if note == self.selected_note else '#000000'
-                    outline_width = 2 if note == self.selected_note else 1
-
-                    # Create note rectangle with rounded corners
-                    self._create_rounded_rectangle(
-                        x1, y - self.grid_size/2,  # Adjust y position for center alignment
-                        x2, y + self.grid_size/2,  # Adjust y position for center alignment
-                        fill=fill_color,
-                        outline=outline_color,
-                        width=outline_width,
-                        radius=4
-                    )
-
-                    # Add gradient effect
-                    if not group.muted:
-                        highlight_y = y - self.grid_size/4  # Adjust for centered alignment
-                        highlight_height = self.grid_size/2
-                        self._create_rounded_rectangle(
-                            x1 + 2, highlight_y,
-                            x2 - 2, highlight_y + highlight_height,
-                            fill=self._lighten_color(group.color),
-                            outline='',
-                            radius=2,
-                            stipple='gray25'
-                        )
+        # Only touch the item states when the cursor is shown or hidden
+        if self.is_playing != self._cursor_shown:
+            self._cursor_shown = self.is_playing
+            state = 'normal' if self.is_playing else 'hidden'
+            self.canvas.itemconfigure(self._cursor, state=state)
+            self.timeline.itemconfigure(self._timeline_cursor, state=state)
 
     def _create_rounded_rectangle(self, x1, y1, x2, y2, radius=5, **kwargs):
         """Create a rounded rectangle on the canvas."""
-        points = [
-            x1 + radius, y1,
-            x2 - radius, y1,
-            x2, y1,
-            x2, y1 + radius,
-            x2, y2 - radius,
-            x2, y2,
-            x2 - radius, y2,
-            x1 + radius, y2,
-            x1, y2,
-            x1, y2 - radius,
-            x1, y1 + radius,
-            x1, y1
-        ]
-
+        points = self._rounded_rect_points(x1, y1, x2, y2, radius)
         return self.canvas.create_polygon(points, smooth=True, **kwargs)
 
+    @staticmethod
+    def _rounded_rect_points(x1, y1, x2, y2, radius):
+        """Get the polygon points of a rounded rectangle as an int tuple."""
+        x1, y1, x2, y2, radius = int(x1), int(y1), int(x2), int(y2), int(radius)
+        left, right = x1 + radius, x2 - radius
+        top, bottom = y1 + radius, y2 - radius
+        return (left, y1, right, y1, x2, y1, x2, top, x2, bottom, x2, y2,
+                right, y2, left, y2, x1, y2, x1, bottom, x1, top, x1, y1)
+
+    def _grid_tile(self):
+        """Get the grid image for one bar, rebuilding it after a zoom.
+
+        The tile is four cells wide and spans all 88 rows, with a bar line
+        at x = 0, dotted beat lines and the row separators.
+        """
+        gs = self.grid_size
+        if self._grid_photo is not None and self._grid_photo_size == gs:
+            return self._grid_photo
+
+        bg = '#1E1E1E'
+        tile_w = gs * 4
+        tile_h = gs * 88
+        photo = tk.PhotoImage(width=tile_w, height=tile_h)
+        photo.put(bg, to=(0, 0, tile_w, tile_h))
+
+        # Vertical lines; beat lines are dotted like a (1, 2) dash
+        def column_color(x, y):
+            if x % gs:
+                return bg
+            if x == 0:
+                return '#444444'
+            return '#333333' if y % 3 == 0 else bg
+
+        for x in range(0, tile_w, gs):
+            photo.put(' '.join('{%s}' % column_color(x, y) for y in range(tile_h)),
+                      to=(x, 0))
+
+        # Row separators, drawn over the vertical lines; only C rows are solid
+        for i, color, c_label in _ROW_META:
+            y = i * gs
+            is_c = c_label is not None
+            row = [color if is_c or x % 3 == 0 else column_color(x, y)
+                   for x in range(tile_w)]
+            photo.put('{%s}' % ' '.join(row), to=(0, y))
+
+        self._grid_photo = photo
+        self._grid_photo_size = gs
+        return photo
+
     def _draw_grid(self, width, height):
         """Draw the grid lines and time markers."""
-        # Draw vertical grid lines
-        for x in range(0, width, self.grid_size):
-            is_major = (x // self.grid_size) % 4 == 0
-            color = '#444444' if is_major else '#333333'
-
-            self.canvas.create_line(
-                x, 0, x, height,
-                fill=color,
-                width=1,
-                dash=None if is_major else (1, 2)
-            )
-
-            if is_major:
-                time = (x / self.grid_size) * self.time_scale
-                self.timeline.create_text(
+        gs = self.grid_size
+        ts = self.time_scale
+        tick_labels = self._tick_labels
+
+        # Stamp the grid tile, one bar wide, across the roll
+        photo = self._grid_tile()
+        tile_w = photo.width()
+        for x in range(0, width, tile_w):
+            self.canvas.create_image(x, 0, image=photo, anchor='nw', tags=('bg',))
+
+        # Label the bar lines on the timeline
+        label_count = 0
+        for x in range(0, width, gs * 4):
+            # Reuse pooled timeline labels instead of recreating them
+            time = (x / gs) * ts
+            text = f"{time:.1f}s"
+            if label_count < len(tick_labels):
+                label = tick_labels[label_count]
+                self.timeline.itemconfigure(label, text=text)
+                self.timeline.coords(label, x, 15)
+            else:
+                tick_labels.append(self.timeline.create_text(
                     x, 15,
-                    text=f"{time:.1f}s",
+                    text=text,
                     fill='white',
                     anchor='center'
-                )
-
-        # Draw horizontal grid lines
-        for i in range(88):
-            y = i * self.grid_size
-            midi_note = 88 - i
-            note_number = midi_note % 12
-            is_black = note_number in [1, 3, 6, 8, 10]
-            is_c = note_number == 0
-
-            color = '#444444' if is_c else '#333333' if not is_black else '#222222'
-
-            self.canvas.create_line(
-                0, y, width, y,
-                fill=color,
-                width=1,
-                dash=None if is_c else (1, 2)
-            )
-
-            if is_c:
-                octave = (midi_note // 12) - 1
+                ))
+            label_count += 1
+
+        # Drop labels left over from a wider layout
+        if label_count < len(tick_labels):
+            for label in tick_labels[label_count:]:
+                self.timeline.delete(label)
+            del tick_labels[label_count:]
+
+        # Label the C rows
+        for i, _, c_label in _ROW_META:
+            if c_label is not None:
                 self.canvas.create_text(
-                    5, y + self.grid_size/2,
-                    text=f"C{octave}",
+                    5, i * gs + gs/2,
+                    text=c_label,
                     fill='white',
-                    anchor='w'
+                    anchor='w',
+                    tags=('bg',)
                 )
 
     def _draw_notes(self, width, height):
-        """Draw all notes on the canvas."""
-        for group in self.groups:
-            if group.visible:
-                for note in group.notes:
-                    x1 = int((note.start_time / self.time_scale) * self.grid_size)
-                    x2 = int(((note.start_time + note.duration) / self.time_scale) * self.grid_size)
-
-                    midi_note = int(round(12 * np.log2(note.frequency/440) + 69))
-                    y = (88 - midi_note) * self.grid_size
-
-                    # Draw note rectangle with group color
-                    fill_color = '#666666' if group.muted else group.color
-                    self.canvas.create_rectangle(
-                        x1, y,
-                        x2, y + self.grid_size - 1,
-                        fill=fill_color,
-                        outline='white' if note == self.selected_note else '#000000',
-                        width=2 if note == self.selected_note else 1
-                    )
-
-                    # Add subtle gradient effect
-                    if not group.muted:
-                        highlight_y = y + 2
-                        highlight_height = (self.grid_size - 4) // 2
-                        self.canvas.create_rectangle(
-                            x1 + 2, highlight_y,
-                            x2 - 2, highlight_y + highlight_height,
-                            fill=self._lighten_color(group.color),
-                            outline='',
-                            stipple='gray25'
+        """Create, update or delete note items to match the current notes."""
+        # Bind loop invariants to locals for the per-note loop
+        gs = self.grid_size
+        px_per_sec, x_offset = self._note_x_scale()
+        selected = self.selected_note
+        canvas = self.canvas
+
+        # Only notes overlapping the visible x range get canvas items
+        x_lo = canvas.canvasx(0)
+        x_hi = canvas.canvasx(self._canvas_w)
+        note_items = self._note_items
+        free_items = self._free_note_items
+        rounded_rect_points = self._rounded_rect_points
+
+        # Visit groups ordered by fill color so that items sharing a fill
+        # are created and configured back to back
+        def fill_of(group):
+            return group.muted_color if group.muted else group.color
+
+        seen = set()
+        canvas.delete('highlight')
+        for group in sorted(self.groups, key=fill_of):
+            if not group.notes:
+                continue
+            # Hidden groups are drawn too so visibility toggles are a single
+            # itemconfigure on the group tag
+            state = 'normal' if group.visible else 'hidden'
+            note_tags = ('fg', 'note', group.tag)
+            fill_color = fill_of(group)
+
+            # Compute the boxes of the notes in the visible time window in
+            # one kernel pass, aligning x to the grid and spanning the
+            # note's row in y
+            arrays = group.note_arrays()
+            lo, hi = group.window((x_lo - x_offset) / px_per_sec,
+                                  (x_hi + 1 - x_offset) / px_per_sec)
+            x1s, y1s, x2s, y2s, visible = compute_boxes(
+                arrays['start'][lo:hi], arrays['dur'][lo:hi], arrays['midi'][lo:hi],
+                px_per_sec, x_offset, gs, x_lo, x_hi
+            )
+            shown = np.flatnonzero(visible)
+            notes = group.notes[lo:hi]
+            boxes = zip(x1s[shown].tolist(), y1s[shown].tolist(),
+                        x2s[shown].tolist(), y2s[shown].tolist())
+
+            # Only two styles occur within a group
+            plain_style = (fill_color, '#000000', 1, state, note_tags)
+            selected_style = (fill_color, 'white', 2, state, note_tags)
+
+            for note, box in zip([notes[i] for i in shown.tolist()], boxes):
+                is_selected = note is selected
+                style = selected_style if is_selected else plain_style
+
+                # Reuse the note's item, touching only what changed
+                seen.add(note)
+                entry = note_items.get(note)
+                if entry is None:
+                    if free_items:
+                        item = free_items.pop()
+                        canvas.coords(item, *rounded_rect_points(*box, 4))
+                        canvas.itemconfigure(item, fill=style[0], outline=style[1],
+                                             width=style[2], state=state, tags=note_tags)
+                    else:
+                        item = self._create_rounded_rectangle(
+                            *box,
+                            fill=style[0],
+                            outline=style[1],
+                            width=style[2],
+                            radius=4,
+                            state=state,
+                            tags=note_tags
                         )
+                    note_items[note] = [item, box, style]
+                else:
+                    item = entry[0]
+                    if entry[1] != box:
+                        canvas.coords(item, *rounded_rect_points(*box, 4))
+                        entry[1] = box
+                    if entry[2] != style:
+                        canvas.itemconfigure(item, fill=style[0], outline=style[1],
+                                             width=style[2], state=state, tags=note_tags)
+                        entry[2] = style
+
+                # Highlight the top edge of the selected note
+                if is_selected:
+                    self._draw_highlight(group, box)
+
+        # Hide items whose notes are gone or off screen and keep them for
+        # reuse; dropping the group tag keeps group toggles from showing them
+        for key in note_items.keys() - seen:
+            item = note_items.pop(key)[0]
+            canvas.itemconfigure(item, state='hidden', tags=('fg',))
+            free_items.append(item)
+
+    def _note_x_scale(self):
+        """Get the pixels per second and grid-aligning x offset of note boxes."""
+        subdivision = (self.snap_settings['grid_division']
+                    if self.snap_settings['mode'] == 'grid'
+                    else 3 if self.snap_settings['mode'] == 'triplet'
+                    else 1)
+        grid_unit = self.grid_size / subdivision
+        return self.grid_size / self.time_scale, grid_unit / 2
+
+    def _draw_highlight(self, group, box):
+        """Highlight the top edge of the selected note."""
+        x1, y1, x2, _ = box
+        state = 'normal' if group.visible and not group.muted else 'hidden'
+        self.canvas.create_line(
+            x1 + 2, y1 + 2,
+            x2 - 2, y1 + 2,
+            fill=group.highlight_color,
+            width=2,
+            state=state,
+            tags=('fg', 'highlight', group.tag)
+        )
 
-    def _lighten_color(self, color):
-        """Create a lighter version of a color for gradient effect."""
-        r = int(color[1:3], 16)
-        g = int(color[3:5], 16)
-        b = int(color[5:7], 16)
-
-        r = min(255, int(r * 1.2))
-        g = min(255, int(g * 1.2))
-        b = min(255, int(b * 1.2))
-
-        return f'#{r:02x}{g:02x}{b:02x}'
-
-    def update_roll(self):
-        """Update the piano roll display."""
-        self.redraw()
-        self.after(50, self.update_roll)
+    def _request_redraw(self):
+        """Schedule a full redraw for the next idle moment, at most once."""
+        self._needs_full_redraw = True
+        if not self._redraw_scheduled:
+            self._redraw_scheduled = True
+            self.after_idle(self._do_redraw)
+
+    def _request_note_redraw(self, note, group):
+        """Schedule a redraw of just one note's item for the next idle moment."""
+        self._dirty_notes[note] = group
+        if not self._redraw_scheduled:
+            self._redraw_scheduled = True
+            self.after_idle(self._do_redraw)
+
+    def _do_redraw(self):
+        """Run the redraw requested by _request_redraw or _request_note_redraw."""
+        self._redraw_scheduled = False
+        if self._needs_full_redraw or not self._redraw_dirty_notes():
+            self.redraw()
+        self._dirty_notes.clear()
+
+    def _redraw_dirty_notes(self):
+        """Update only the items of the notes queued by _request_note_redraw.
+
+        Returns:
+            bool: False if a full redraw is needed instead, because a note
+            has no item yet or now reaches past the scroll region
+        """
+        width = self._scroll_size[0] if self._scroll_size else 0
+        gs = self.grid_size
+        px_per_sec, x_offset = self._note_x_scale()
+        canvas = self.canvas
+        updates = []
+        for note, group in self._dirty_notes.items():
+            entry = self._note_items.get(note)
+            end = note.start_time + note.duration
+            if (entry is None or group is None
+                    or (end / self.time_scale) * gs + gs * 4 > width):
+                return False
+
+            # Same box as compute_boxes gives for the note
+            y1 = (88 - note.midi) * gs
+            box = (int(note.start_time * px_per_sec + x_offset), y1,
+                   int(end * px_per_sec + x_offset), y1 + gs)
+            updates.append((note, group, entry, box))
+
+        for note, group, entry, box in updates:
+            if entry[1] != box:
+                canvas.coords(entry[0], *self._rounded_rect_points(*box, 4))
+                entry[1] = box
+            if note is self.selected_note:
+                canvas.delete('highlight')
+                self._draw_highlight(group, box)
+        return True